@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-15 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("association", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="notification",
+            options={"ordering": ["-created_at"]},
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["association", "is_read", "-created_at"],
+                name="notif_assoc_read_created_idx",
+            ),
+        ),
+    ]
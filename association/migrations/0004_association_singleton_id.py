@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-15 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("association", "0003_notification_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="association",
+            name="singleton_id",
+            field=models.PositiveSmallIntegerField(
+                default=1, editable=False, unique=True
+            ),
+        ),
+    ]
@@ -2,7 +2,7 @@ from datetime import datetime
 
 from cloudinary.models import CloudinaryField
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import IntegrityError, models, transaction
 
 from main.models import AdminUser
 from utils.utils import validate_file_type
@@ -15,7 +15,6 @@ class Association(models.Model):
         ("faculty", "Faculty"),
         ("other", "Other"),
     ]
-
     admin = models.OneToOneField(
         AdminUser, on_delete=models.CASCADE, related_name="association"
     )
@@ -40,6 +39,10 @@ class Association(models.Model):
         on_delete=models.SET_NULL,
         related_name="current_for_association",
     )
+    # Always 1; the unique index lets the database enforce a single association
+    singleton_id = models.PositiveSmallIntegerField(
+        default=1, unique=True, editable=False
+    )
 
     def __str__(self):
         return f"{self.association_short_name} ({self.association_type})"
@@ -50,13 +53,24 @@ class Association(models.Model):
 
     def save(self, *args, **kwargs):
         """Override save to ensure only one association exists"""
-        if not self.pk:  # New instance
-            # Check if an association already exists
+        if self.pk:
+            return super().save(*args, **kwargs)
+
+        # New instance: the singleton_id unique index rejects a second row
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except IntegrityError:
             if Association.objects.exists():
                 raise ValidationError(
                     "Only one association can exist at a time. Please delete the existing association first."
                 )
-        super().save(*args, **kwargs)
+            raise
+
+    def set_current_session(self, session):
+        """Persist current_session alone, without a full save() or its signals"""
+        Association.objects.filter(pk=self.pk).update(current_session=session)
+        self.current_session = session
 
     @classmethod
     def get_single_association(cls):
@@ -84,10 +98,12 @@ class Session(models.Model):
         return f"{self.association.association_short_name} - {self.title}"
 
     def save(self, *args, **kwargs):
+        # Callers that already deactivated the other sessions pass skip_deactivate=True
+        skip_deactivate = kwargs.pop("skip_deactivate", False)
         # If this session is being set as active, deactivate other sessions for this association
-        if self.is_active:
+        if self.is_active and not skip_deactivate:
             Session.objects.filter(
-                association=self.association, is_active=True
+                association_id=self.association_id, is_active=True
             ).exclude(pk=self.pk).update(is_active=False)
         super().save(*args, **kwargs)
 
@@ -105,5 +121,14 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["association", "is_read", "-created_at"],
+                name="notif_assoc_read_created_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"Notification for {self.association.association_short_name}: {self.message[:20]}"
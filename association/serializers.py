@@ -66,7 +66,7 @@ class AssociationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Association
-        fields = "__all__"
+        exclude = ["singleton_id"]
         read_only_fields = ["admin", "bank_account", "payment_items", "logo_url"]
 
 
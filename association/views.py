@@ -1,7 +1,9 @@
+from django.db import transaction
+from django.db.models import Count, Q
 from rest_framework import generics, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
@@ -13,7 +15,9 @@ from .serializers import (
     SessionSerializer,
 )
 
-class NotificationPagination(PageNumberPagination):
+class NotificationPagination(CursorPagination):
+    # Keyset pagination over the (association, is_read, created_at) index
+    ordering = "-created_at"
     page_size = 5
     page_size_query_param = "page_size"
     max_page_size = 10
@@ -29,7 +33,9 @@ class AssociationViewSet(viewsets.ModelViewSet):
             # Since Association has OneToOneField to AdminUser with related_name='association'
             # We can access it directly if the user IS an AdminUser
             if hasattr(self.request.user, "association"):
-                return Association.objects.filter(pk=self.request.user.association.pk)
+                return Association.objects.select_related(
+                    "admin", "current_session"
+                ).filter(pk=self.request.user.association.pk)
             return Association.objects.none()
         except (AttributeError, Association.DoesNotExist):
             return Association.objects.none()
@@ -40,6 +46,9 @@ class RetrieveAssociationViewSet(generics.RetrieveAPIView):
     lookup_field = "association_short_name"
     permission_classes = [AllowAny]
 
+    def get_queryset(self):
+        return Association.objects.select_related("admin", "current_session")
+
 
 class GetSingleAssociationView(generics.RetrieveAPIView):
     """
@@ -51,7 +60,9 @@ class GetSingleAssociationView(generics.RetrieveAPIView):
 
     def get_object(self):
         """Get the single association instance"""
-        association = Association.objects.first()
+        association = Association.objects.select_related(
+            "admin", "current_session"
+        ).first()
         if not association:
             raise ValidationError("No association found in the system")
         return association
@@ -61,7 +72,7 @@ class GetSingleAssociationView(generics.RetrieveAPIView):
 class NotificationViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = NotificationSerializer
-    queryset = Notification.objects.all()
+    queryset = Notification.objects.none()
     pagination_class = NotificationPagination  # Custom pagination
 
     def get_queryset(self):
@@ -99,12 +110,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
             if hasattr(request.user, "association"):
                 association = request.user.association
 
-                # Get count of unread notifications before updating
-                unread_count = Notification.objects.filter(
-                    association=association, is_read=False
-                ).count()
-
-                # Mark all as read
+                # Mark all as read; the UPDATE row count is the unread count before it ran
                 updated_count = Notification.objects.filter(
                     association=association, is_read=False
                 ).update(is_read=True)
@@ -114,7 +120,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
                         "success": True,
                         "message": f"Marked {updated_count} notifications as read",
                         "updated_count": updated_count,
-                        "total_unread_before": unread_count,
+                        "total_unread_before": updated_count,
                     },
                     status=status.HTTP_200_OK,
                 )
@@ -185,15 +191,12 @@ class SessionViewSet(viewsets.ModelViewSet):
         # When creating a new session, it becomes active and current
         association = getattr(self.request.user, "association", None)
         if association:
-            # Deactivate all other sessions for this association
-            Session.objects.filter(association=association, is_active=True).update(is_active=False)
-            
-            # Create the new session as active
-            session = serializer.save(is_active=True)
-            
-            # Set as current session for the association
-            association.current_session = session
-            association.save()
+            with transaction.atomic():
+                # Create the new session as active; Session.save deactivates the others
+                session = serializer.save(is_active=True)
+
+                # Set as current session for the association
+                association.set_current_session(session)
         else:
             session = serializer.save()
 
@@ -205,30 +208,34 @@ class SessionViewSet(viewsets.ModelViewSet):
             association = request.user.association
 
             # Verify session belongs to this association
-            if session.association != association:
+            if session.association_id != association.pk:
                 return Response(
                     {"error": "Session does not belong to your association"},
                     status=status.HTTP_403_FORBIDDEN,
                 )
+            # Reuse the in-memory association instead of refetching it
+            session.association = association
+
+            with transaction.atomic():
+                # Deactivate all other sessions for this association
+                Session.objects.filter(
+                    association=association, is_active=True
+                ).exclude(pk=session.pk).update(is_active=False)
+
+                # Activate this session
+                session.is_active = True
+                session.save(
+                    update_fields=["is_active", "updated_at"], skip_deactivate=True
+                )
 
-            # Deactivate all other sessions for this association
-            Session.objects.filter(association=association, is_active=True).exclude(
-                pk=session.pk
-            ).update(is_active=False)
-
-            # Activate this session
-            session.is_active = True
-            session.save()
-
-            # Set as current session
-            association.current_session = session
-            association.save()
+                # Set as current session
+                association.set_current_session(session)
 
             return Response(
                 {
                     "success": True,
                     "message": f'Session "{session.title}" is now the current active session',
-                    "current_session": SessionSerializer(session).data,
+                    "current_session": self.get_serializer(session).data,
                 }
             )
 
@@ -269,7 +276,29 @@ class AssociationProfileView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        return getattr(self.request.user, "association", None)
+        return (
+            Association.objects.select_related("admin", "current_session")
+            .only(
+                "id",
+                "association_name",
+                "association_short_name",
+                "association_type",
+                "theme_color",
+                "logo",
+                "current_session",
+                "admin__id",
+                "admin__email",
+                "admin__first_name",
+                "admin__last_name",
+            )
+            .annotate(
+                unread_count=Count(
+                    "notifications", filter=Q(notifications__is_read=False)
+                )
+            )
+            .filter(admin=self.request.user)
+            .first()
+        )
 
     def retrieve(self, request, *args, **kwargs):
         association = self.get_object()
@@ -279,15 +308,17 @@ class AssociationProfileView(generics.RetrieveAPIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Get all sessions for this association
-        sessions = Session.objects.filter(association=association).order_by(
-            "-created_at"
-        )
-
         serializer = self.get_serializer(association)
         data = serializer.data
 
-        # Add sessions list
-        data["sessions"] = SessionSerializer(sessions, many=True).data
+        # Add sessions list as plain rows; no per-session serializer is needed
+        data["sessions"] = list(
+            Session.objects.filter(association=association)
+            .order_by("-created_at")
+            .values(*SessionSerializer.Meta.fields)
+        )
+
+        # Saves the frontend a separate unread-count round-trip
+        data["unread_count"] = association.unread_count
 
         return Response(data)
@@ -1,10 +1,22 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 
+from association.models import Association
+
+from .models import AdminUser
+
 class VersionedJWTAuthentication(JWTAuthentication):
     def get_user(self, validated_token):
         user = super().get_user(validated_token)
         token_version = validated_token.get("token_version", None)
         if token_version is None or token_version != user.token_version:
             raise AuthenticationFailed("Token is invalid or expired", code="token_not_valid")
-        return user
\ No newline at end of file
+        # Load the association (with its current session) once per request so later
+        # user.association lookups hit the instance cache, including when it is missing
+        association = (
+            Association.objects.select_related("current_session")
+            .filter(admin=user)
+            .first()
+        )
+        AdminUser.association.related.set_cached_value(user, association)
+        return user
@@ -0,0 +1,47 @@
+# Generated by Django 6.0 on 2026-10-15 10:00
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payers", "0001_initial"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="payer",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("first_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="payer_first_name_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payer",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("last_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="payer_last_name_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payer",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("matric_number"),
+                    name="gin_trgm_ops",
+                ),
+                name="payer_matric_number_trgm",
+            ),
+        ),
+    ]
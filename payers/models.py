@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 from association.models import Association, Session
 
@@ -41,3 +43,19 @@ class Payer(models.Model):
                 fields=["session", "matric_number"], name="unique_matric_per_session"
             ),
         ]
+        # icontains compiles to UPPER(col::text) LIKE UPPER(...), so the trigram
+        # indexes are built on that expression rather than the bare column
+        indexes = [
+            GinIndex(
+                OpClass(Upper("first_name"), name="gin_trgm_ops"),
+                name="payer_first_name_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("last_name"), name="gin_trgm_ops"),
+                name="payer_last_name_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("matric_number"), name="gin_trgm_ops"),
+                name="payer_matric_number_trgm",
+            ),
+        ]
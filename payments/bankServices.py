@@ -1,15 +1,35 @@
 import logging
-from datetime import datetime, timezone
 
+import orjson
 import requests
 from django.conf import settings
 from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
-
-def _ts():
-    return datetime.now(timezone.utc).isoformat()
+# Shared HTTP session so Paystack calls reuse pooled keep-alive connections.
+# Only gateway errors are retried; a connect or read timeout fails at once
+# so a slow Paystack can't hold a request for several timeouts in a row
+_http = requests.Session()
+_http.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=2,
+            connect=0,
+            read=0,
+            other=0,
+            status=2,
+            backoff_factor=0.2,
+            status_forcelist=[502, 503, 504],
+            raise_on_status=False,
+        ),
+    ),
+)
 
 
 class VerifyBankService:
@@ -25,6 +45,12 @@ class VerifyBankService:
     }
     BANK_LIST_CACHE_KEY = "paystack_bank_list"
     BANK_LIST_CACHE_TIMEOUT = 60 * 60 * 24  # 24 hours
+    BANK_NAME_MAP_CACHE_KEY = "paystack_bank_code_to_name"
+    BANK_LIST_STALE_CACHE_KEY = "paystack_bank_list:stale"
+    BANK_LIST_STALE_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # 7 days
+    BANK_LIST_LOCK_KEY = "paystack_bank_list:lock"
+    # Longer than a worst-case refresh: 3 attempts x 15s timeout plus backoff
+    BANK_LIST_LOCK_TIMEOUT = 60  # seconds
 
     @staticmethod
     def get_bank_list():
@@ -32,13 +58,9 @@ class VerifyBankService:
         Fetch list of Nigerian banks and their codes from Paystack.
         Returns a list of { name, code } dicts.
         """
-        print(f"[{_ts()}] [BANKS] Fetching bank list from Paystack...")
         cached_banks = cache.get(VerifyBankService.BANK_LIST_CACHE_KEY)
         if cached_banks:
-            logger.info(
-                f"[{_ts()}][BANKS] Using cached banks count={len(cached_banks)}"
-            )
-            print(f"[{_ts()}] [BANKS] Cached banks: {len(cached_banks)}")
+            logger.info("[BANKS] Using cached banks count=%s", len(cached_banks))
             return cached_banks
 
         # Fallback list in case Paystack is unreachable
@@ -65,23 +87,38 @@ class VerifyBankService:
             "country": "nigeria",  # Paystack uses 'country' parameter
             "perPage": 100  # Get more banks in one request
         }
-        
+
+        # Only one caller refreshes the list; the rest serve the last good copy.
+        # cache.add is only atomic within the cache backend, so with the default
+        # per-process LocMemCache this serialises threads of one gunicorn
+        # process, not separate processes
+        if not cache.add(
+            VerifyBankService.BANK_LIST_LOCK_KEY,
+            1,
+            VerifyBankService.BANK_LIST_LOCK_TIMEOUT,
+        ):
+            stale_banks = cache.get(VerifyBankService.BANK_LIST_STALE_CACHE_KEY)
+            logger.info(
+                "[BANKS] Refresh in progress, serving stale=%s", bool(stale_banks)
+            )
+            return stale_banks or fallback_banks
+
         try:
-            resp = requests.get(
+            resp = _http.get(
                 url, headers=VerifyBankService.HEADERS, params=params, timeout=15
             )
             data = (
-                resp.json()
-                if resp.headers.get("content-type", "").startswith("application/json")
+                orjson.loads(resp.content)
+                if resp.content
+                and resp.headers.get("content-type", "").startswith("application/json")
                 else {}
             )
-            
+
             # Paystack returns { status: true/false, message: "", data: [...] }
             if not resp.ok or not data.get("status"):
                 logger.error(
-                    f"[{_ts()}][BANKS][ERR] status={resp.status_code} body={data}"
+                    "[BANKS][ERR] status=%s body=%s", resp.status_code, data
                 )
-                print(f"[{_ts()}] [BANKS][ERR] status={resp.status_code}")
                 raise RuntimeError("Paystack bank list error")
 
             banks_raw = data.get("data") or []
@@ -97,14 +134,26 @@ class VerifyBankService:
                 banks,
                 VerifyBankService.BANK_LIST_CACHE_TIMEOUT,
             )
-            logger.info(f"[{_ts()}][BANKS][OK] fetched={len(banks)}")
-            print(f"[{_ts()}] [BANKS][OK] fetched={len(banks)} banks from Paystack")
+            cache.set(
+                VerifyBankService.BANK_NAME_MAP_CACHE_KEY,
+                {b["code"]: b["name"] for b in banks},
+                VerifyBankService.BANK_LIST_CACHE_TIMEOUT,
+            )
+            cache.set(
+                VerifyBankService.BANK_LIST_STALE_CACHE_KEY,
+                banks,
+                VerifyBankService.BANK_LIST_STALE_CACHE_TIMEOUT,
+            )
+            logger.info("[BANKS][OK] fetched=%s", len(banks))
             return banks
-            
+
         except Exception as e:
-            logger.error(f"[{_ts()}][BANKS][EXC] {e}", exc_info=True)
-            print(f"[{_ts()}] [BANKS] Using fallback banks: {len(fallback_banks)}")
-            return fallback_banks
+            logger.error("[BANKS][EXC] %s", e, exc_info=True)
+            return (
+                cache.get(VerifyBankService.BANK_LIST_STALE_CACHE_KEY) or fallback_banks
+            )
+        finally:
+            cache.delete(VerifyBankService.BANK_LIST_LOCK_KEY)
 
     @staticmethod
     def verify_account(account_number, bank_code):
@@ -112,8 +161,6 @@ class VerifyBankService:
         Verify bank account using Paystack.
         Returns dict with keys: account_name, bank_name, account_number, bank_code.
         """
-        print(f"[{_ts()}] [VERIFY] acct={account_number} bank={bank_code}")
-        
         # Paystack endpoint: GET /bank/resolve
         url = f"{VerifyBankService.BASE_URL.rstrip('/')}/bank/resolve"
         params = {
@@ -122,7 +169,7 @@ class VerifyBankService:
         }
 
         try:
-            resp = requests.get(
+            resp = _http.get(
                 url, headers=VerifyBankService.HEADERS, params=params, timeout=20
             )
             data = (
@@ -134,34 +181,36 @@ class VerifyBankService:
             # Paystack returns { status: true/false, message: "", data: {...} }
             if not resp.ok or not data.get("status"):
                 logger.error(
-                    f"[{_ts()}][VERIFY][ERR] status={resp.status_code} body={data}"
+                    "[VERIFY][ERR] status=%s body=%s", resp.status_code, data
                 )
-                print(f"[{_ts()}] [VERIFY][ERR] status={resp.status_code} msg={data.get('message', 'Unknown error')}")
                 return None
 
             d = data.get("data") or {}
             if d.get("account_name"):
+                bank_names = cache.get(VerifyBankService.BANK_NAME_MAP_CACHE_KEY) or {
+                    b["code"]: b["name"] for b in VerifyBankService.get_bank_list()
+                }
                 result = {
                     "account_name": d.get("account_name"),
                     "account_number": str(account_number),
                     "bank_code": str(bank_code),
-                    "bank_name": "",  # Paystack doesn't return bank name in resolve, we can look it up if needed
+                    # Paystack doesn't return bank name in resolve, so look it up by code
+                    "bank_name": bank_names.get(str(bank_code), ""),
                     # Optional fields for compatibility
                     "first_name": "",
                     "last_name": "",
                     "other_name": "",
                 }
                 logger.info(
-                    f"[{_ts()}][VERIFY][OK] acct={result['account_number']} name={result['account_name']}"
+                    "[VERIFY][OK] acct=%s name=%s",
+                    result["account_number"],
+                    result["account_name"],
                 )
-                print(f"[{_ts()}] [VERIFY][OK] acct={result['account_number']} name={result['account_name']}")
                 return result
 
-            logger.warning(f"[{_ts()}][VERIFY] No account_name in response: {data}")
-            print(f"[{_ts()}] [VERIFY] No account_name found")
+            logger.warning("[VERIFY] No account_name in response: %s", data)
             return None
             
         except Exception as e:
-            logger.error(f"[{_ts()}][VERIFY][EXC] {e}", exc_info=True)
-            print(f"[{_ts()}] [VERIFY][EXC] {str(e)}")
+            logger.error("[VERIFY][EXC] %s", e, exc_info=True)
             return None
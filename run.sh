@@ -1,3 +1,3 @@
 #!/usr/bin/env bash
 set -o errexit
-gunicorn config.wsgi:application --env DJANGO_SETTINGS_MODULE=config.settings.prod
\ No newline at end of file
+gunicorn config.wsgi:application --threads 4 --env DJANGO_SETTINGS_MODULE=config.settings.prod
\ No newline at end of file
@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-15 10:00
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        # Creates the pg_trgm extension
+        ("payers", "0002_payer_trigram_indexes"),
+        ("transactions", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("reference_id"),
+                    name="gin_trgm_ops",
+                ),
+                name="txn_ref_trgm",
+            ),
+        ),
+    ]
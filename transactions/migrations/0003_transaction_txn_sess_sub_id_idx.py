@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-15 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0002_transaction_txn_ref_trgm"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["session", "-submitted_at", "-id"],
+                name="txn_sess_sub_id_idx",
+            ),
+        ),
+    ]
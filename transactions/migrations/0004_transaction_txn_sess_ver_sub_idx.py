@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-15 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0003_transaction_txn_sess_sub_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["session", "is_verified", "-submitted_at"],
+                name="txn_sess_ver_sub_idx",
+            ),
+        ),
+    ]
@@ -1,7 +1,9 @@
 import uuid
 
 from cloudinary.models import CloudinaryField
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 from association.models import Association, Session
 from payers.models import Payer
@@ -12,6 +14,13 @@ from .utils import generate_unique_reference_id
 
 
 class Transaction(models.Model):
+    # Admin list responses are cached per session; bumping the version on
+    # any save or delete orphans every cached page for that session at once.
+    # Only active with a shared cache backend (see TRANSACTION_LIST_CACHE_ENABLED)
+    LIST_CACHE_KEY = "txn_list:{association_id}:{session_id}:{version}:{params}"
+    LIST_CACHE_VERSION_KEY = "txn_list_version:{session_id}"
+    LIST_CACHE_TIMEOUT = 15  # seconds
+
     payer = models.ForeignKey(
         Payer, on_delete=models.CASCADE, related_name="transactions"
     )
@@ -36,6 +45,23 @@ class Transaction(models.Model):
         Session, on_delete=models.CASCADE, related_name="transactions"
     )
 
+    class Meta:
+        indexes = [
+            # Matches the UPPER(reference_id::text) that icontains search emits
+            GinIndex(
+                OpClass(Upper("reference_id"), name="gin_trgm_ops"),
+                name="txn_ref_trgm",
+            ),
+            models.Index(
+                fields=["session", "-submitted_at", "-id"],
+                name="txn_sess_sub_id_idx",
+            ),
+            models.Index(
+                fields=["session", "is_verified", "-submitted_at"],
+                name="txn_sess_ver_sub_idx",
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.reference_id:
             while True:
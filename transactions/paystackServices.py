@@ -1,62 +1,86 @@
 import hashlib
 import hmac
-import json
 import logging
-import re
-import traceback
-from datetime import datetime
-from datetime import timezone as dt_tz
 from decimal import ROUND_HALF_UP, Decimal
 from typing import Dict, Any, Optional
 
+import orjson
 import paystack
 from paystack.api.transaction_ import Transaction
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 logger = logging.getLogger(__name__)
 
-
-def _ts():
-    return datetime.now(dt_tz.utc).isoformat()
-
-
 def get_paystack_webhook_secret() -> str:
     return getattr(settings, "PAYSTACK_WEBHOOK_SECRET", None) or getattr(
         settings, "PAYSTACK_SECRET", ""
     )
 
 
-def compute_paystack_signature(raw: bytes, secret: str) -> str:
-    return hmac.new(secret.encode("utf-8"), raw, hashlib.sha512).hexdigest()
+# The webhook secret is fixed for the life of the process, so key the HMAC once
+try:
+    _WEBHOOK_SECRET_BYTES = get_paystack_webhook_secret().encode("utf-8")
+except ImproperlyConfigured:
+    _WEBHOOK_SECRET_BYTES = b""
+_WEBHOOK_HMAC = (
+    hmac.new(_WEBHOOK_SECRET_BYTES, None, hashlib.sha512)
+    if _WEBHOOK_SECRET_BYTES
+    else None
+)
+
+
+def compute_paystack_signature(raw: bytes) -> str:
+    # Copying the pre-keyed HMAC skips re-encoding the secret and the key schedule
+    h = _WEBHOOK_HMAC.copy()
+    h.update(raw)
+    return h.hexdigest()
 
 
 def is_valid_paystack_signature(raw_body: bytes, header_signature: str) -> bool:
-    secret = get_paystack_webhook_secret()
-    if not secret or not header_signature:
+    if _WEBHOOK_HMAC is None or not header_signature:
         return False
-    expected = compute_paystack_signature(raw_body, secret)
-    return hmac.compare_digest(expected, header_signature)
+    expected = compute_paystack_signature(raw_body)
+    # Compare as bytes: compare_digest raises TypeError on non-ASCII str input
+    return hmac.compare_digest(
+        expected.encode("ascii"), header_signature.encode("utf-8")
+    )
+
+
+def _to_decimal(amount: str | Decimal | float | int) -> Decimal:
+    """Convert an amount to Decimal without a str() round-trip where avoidable"""
+    if isinstance(amount, Decimal):
+        return amount
+    if isinstance(amount, float):
+        # Go through repr so 1.015 stays 1.015 rather than its binary expansion
+        return Decimal(repr(amount))
+    return Decimal(amount)
 
 
 def _format_amount_2dp(amount: str | Decimal) -> str:
-    d = Decimal(str(amount)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    d = _to_decimal(amount).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
     return f"{d:.2f}"
 
 
-def _sanitize_customer_name(name: str) -> str:
-    if not name:
-        return "DuesPay User"
-    name = re.sub(r"<[^>]*>", "", name)
-    name = re.sub(r"&[A-Za-z]+;", "", name)
-    name = re.sub(r"[^A-Za-z0-9\s\.\,'\-]", "", name)
-    name = re.sub(r"\s+", " ", name).strip()
-    return name or "DuesPay User"
+def _amount_to_kobo(amount: str | Decimal | float | int) -> int:
+    """Convert naira amount to kobo (multiply by 100), rounded to the nearest kobo"""
+    return int(_to_decimal(amount).scaleb(2).to_integral_value())
+
 
+def _calc_fee_kobo(base_kobo: int) -> tuple[int, int]:
+    """Return (transaction_fee, total_amount) in kobo for a base amount in kobo"""
+    # Calculate 1.5% of amount, rounded half up to the nearest kobo
+    percentage_fee = (base_kobo * 15 + 500) // 1000
 
-def _amount_to_kobo(amount: str | Decimal) -> int:
-    """Convert naira amount to kobo (multiply by 100)"""
-    d = Decimal(str(amount)).quantize(Decimal("0.01"))
-    return int(d * 100)
+    # Add ₦100 flat fee, waived for transactions under ₦2,500
+    if base_kobo < 250000:
+        transaction_fee = percentage_fee
+    else:
+        transaction_fee = percentage_fee + 10000
+
+    # Cap fee at ₦2,000
+    transaction_fee = min(transaction_fee, 200000)
+    return transaction_fee, base_kobo + transaction_fee
 
 
 def calculate_paystack_charges(amount: Decimal | str | float) -> dict:
@@ -71,113 +95,84 @@ def calculate_paystack_charges(amount: Decimal | str | float) -> dict:
     - transaction_fee: Paystack fee
     - total_amount: Amount + fee (what customer pays)
     """
-    base_amount = Decimal(str(amount)).quantize(Decimal("0.01"))
-    
-    # Calculate 1.5% of amount
-    percentage_fee = (base_amount * Decimal("0.015")).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-    
-    # Add ₦100 flat fee
-    flat_fee = Decimal("100.00")
-    transaction_fee = percentage_fee + flat_fee
-    
-    # Waive ₦100 for transactions under ₦2,500
-    if base_amount < Decimal("2500.00"):
-        transaction_fee = percentage_fee
-    
-    # Cap fee at ₦2,000
-    if transaction_fee > Decimal("2000.00"):
-        transaction_fee = Decimal("2000.00")
-    
-    total_amount = base_amount + transaction_fee
-    
+    # All arithmetic is done in integer kobo; Decimal is only built for the result
+    base_kobo = _amount_to_kobo(amount)
+    transaction_fee, total_amount = _calc_fee_kobo(base_kobo)
+
     return {
-        "base_amount": base_amount,
-        "transaction_fee": transaction_fee,
-        "total_amount": total_amount,
+        "base_amount": Decimal(base_kobo).scaleb(-2),
+        "transaction_fee": Decimal(transaction_fee).scaleb(-2),
+        "total_amount": Decimal(total_amount).scaleb(-2),
     }
 
 
+_MISSING = object()
+
+
 class PaystackService:
     def __init__(self):
         """Initialize Paystack service with secret key"""
-        print(f"[{_ts()}] PaystackService.__init__() called")
-        
         try:
             self.secret_key = getattr(settings, 'PAYSTACK_SECRET', '')
-            print(f"[{_ts()}] PAYSTACK_SECRET retrieved: '{self.secret_key[:20]}...' (showing first 20 chars)")
             
             if not self.secret_key:
-                error_msg = 'PAYSTACK_SECRET not found in settings'
-                logger.error(error_msg)
-                print(f"[{_ts()}] ERROR: {error_msg}")
-                # Print all available settings that start with PAYSTACK
-                paystack_settings = {k: v for k, v in settings.__dict__.items() if 'PAYSTACK' in str(k)}
-                print(f"[{_ts()}] Available PAYSTACK settings: {paystack_settings}")
-            else:
-                print(f"[{_ts()}] PAYSTACK_SECRET found, length: {len(self.secret_key)}")
-            
-            print(f"[{_ts()}] Setting paystack.api_key...")
+                logger.error("PAYSTACK_SECRET not found in settings")
+
             paystack.api_key = self.secret_key
-            print(f"[{_ts()}] paystack.api_key set successfully")
             
-        except Exception as e:
-            error_msg = f"Error in PaystackService.__init__(): {str(e)}"
-            logger.error(error_msg)
-            print(f"[{_ts()}] CRITICAL ERROR: {error_msg}")
-            print(f"[{_ts()}] Traceback: {traceback.format_exc()}")
+        except Exception:
+            logger.exception("[PAYSTACK][ERR] PaystackService.__init__ failed")
             raise
 
     def _handle_response(self, response) -> Dict[str, Any]:
         """Handle API response object and convert to dict"""
-        print(f"[{_ts()}] _handle_response called with type: {type(response)}")
-        
         try:
-            if hasattr(response, '_status') and hasattr(response, '_data'):
-                print(f"[{_ts()}] Response has _status: {response._status}, _data: {type(response._data)}")
-                if response._status:
+            # Common case: the SDK response object carries _status/_data
+            status_flag = getattr(response, '_status', _MISSING)
+            payload = getattr(response, '_data', _MISSING)
+            if status_flag is not _MISSING and payload is not _MISSING:
+                if status_flag:
                     return {
                         'status': True,
-                        'data': response._data,
+                        'data': payload,
                         'message': getattr(response, '_message', 'Success')
                     }
-                else:
+                return {
+                    'status': False,
+                    'message': getattr(response, '_message', 'Request failed'),
+                    'error': payload if payload else 'Unknown error'
+                }
+
+            response_data = getattr(response, 'data', _MISSING)
+            if isinstance(response_data, dict):
+                if 'authorization_url' in response_data:
                     return {
-                        'status': False,
-                        'message': getattr(response, '_message', 'Request failed'),
-                        'error': response._data if response._data else 'Unknown error'
+                        'status': True,
+                        'data': response_data,
+                        'message': 'Transaction initialized successfully'
                     }
+                return response_data
 
-            if hasattr(response, 'data'):
-                print(f"[{_ts()}] Response has data attribute: {type(response.data)}")
-                if isinstance(response.data, str):
-                    try:
-                        parsed_data = json.loads(response.data)
-                        print(f"[{_ts()}] Parsed JSON data keys: {list(parsed_data.keys()) if isinstance(parsed_data, dict) else 'Not a dict'}")
-                        if isinstance(parsed_data, dict) and 'authorization_url' in parsed_data:
-                            return {
-                                'status': True,
-                                'data': parsed_data,
-                                'message': 'Transaction initialized successfully'
-                            }
-                        return parsed_data
-                    except json.JSONDecodeError as je:
-                        print(f"[{_ts()}] JSON decode error: {str(je)}")
-                        return {'error': 'Invalid JSON response', 'raw_data': response.data}
-
-                elif isinstance(response.data, dict):
-                    print(f"[{_ts()}] Response data is dict with keys: {list(response.data.keys())}")
-                    if 'authorization_url' in response.data:
+            if isinstance(response_data, str):
+                try:
+                    parsed_data = orjson.loads(response_data)
+                    if isinstance(parsed_data, dict) and 'authorization_url' in parsed_data:
                         return {
                             'status': True,
-                            'data': response.data,
+                            'data': parsed_data,
                             'message': 'Transaction initialized successfully'
                         }
-                    return response.data
-
-            if hasattr(response, '__dict__'):
-                response_dict = response.__dict__
-                print(f"[{_ts()}] Response __dict__ keys: {list(response_dict.keys())}")
-                if 'authorization_url' in str(response_dict):
+                    return parsed_data
+                except orjson.JSONDecodeError:
+                    logger.debug("[PAYSTACK] invalid JSON in response data")
+                    return {'error': 'Invalid JSON response', 'raw_data': response_data}
+
+            response_dict = getattr(response, '__dict__', None)
+            if response_dict is not None:
+                nested = response_dict.get('data')
+                if 'authorization_url' in response_dict or (
+                    isinstance(nested, dict) and 'authorization_url' in nested
+                ):
                     return {
                         'status': True,
                         'data': response_dict,
@@ -185,14 +180,10 @@ class PaystackService:
                     }
                 return response_dict
 
-            print(f"[{_ts()}] Fallback: returning raw response string")
             return {'raw_response': str(response), 'status': False}
 
         except Exception as e:
-            error_msg = f"Response handling error: {str(e)}"
-            logger.error(error_msg)
-            print(f"[{_ts()}] ERROR in _handle_response: {error_msg}")
-            print(f"[{_ts()}] Traceback: {traceback.format_exc()}")
+            logger.exception("[PAYSTACK][ERR] response handling failed")
             return {'status': False, 'error': str(e)}
 
     def initialize_payment(
@@ -205,13 +196,8 @@ class PaystackService:
         channels: Optional[list] = None
     ) -> Dict[str, Any]:
         """Initialize a payment transaction with Paystack"""
-        print(f"[{_ts()}] initialize_payment called")
-        print(f"[{_ts()}] Params: email={email}, amount_naira={amount_naira}, reference={reference}")
-        print(f"[{_ts()}] Params: callback_url={callback_url}, channels={channels}")
-        
         try:
-            amount_kobo = _amount_to_kobo(str(amount_naira))
-            print(f"[{_ts()}] Converted {amount_naira} naira to {amount_kobo} kobo")
+            amount_kobo = _amount_to_kobo(amount_naira)
 
             payment_params = {
                 'email': email,
@@ -225,37 +211,28 @@ class PaystackService:
                 payment_params['callback_url'] = callback_url
 
             if metadata:
-                payment_params['metadata'] = json.dumps(metadata)
-                print(f"[{_ts()}] Metadata added: {metadata}")
-
-            print(f"[{_ts()}] Final payment_params: {payment_params}")
+                payment_params['metadata'] = orjson.dumps(metadata).decode()
 
             logger.info(
-                f"[{_ts()}][PAYSTACK][REQ] ref={reference} amount_kobo={amount_kobo} email={email}"
-            )
-            print(
-                f"[{_ts()}] PAYSTACK REQ ref={reference} amount_kobo={amount_kobo} email={email}"
+                "[PAYSTACK][REQ] ref=%s amount_kobo=%s email=%s",
+                reference,
+                amount_kobo,
+                email,
             )
 
-            print(f"[{_ts()}] About to call Transaction.initialize(**payment_params)")
             response = Transaction.initialize(**payment_params)
-            print(f"[{_ts()}] Transaction.initialize returned: {type(response)}")
 
             response_data = self._handle_response(response)
-            print(f"[{_ts()}] Handled response data: {response_data}")
 
             is_successful = (
                 response_data.get('status') == True or
                 'authorization_url' in response_data or
                 (response_data.get('data') and 'authorization_url' in response_data.get('data', {}))
             )
-            
-            print(f"[{_ts()}] is_successful: {is_successful}")
 
             if not is_successful:
                 error_message = response_data.get('message', 'Payment initialization failed')
-                print(f"[{_ts()}] Payment failed with error: {error_message}")
-                logger.error(f"[{_ts()}][PAYSTACK][ERR] ref={reference} error={error_message}")
+                logger.error("[PAYSTACK][ERR] ref=%s error=%s", reference, error_message)
                 raise Exception(error_message)
 
             if 'data' in response_data and isinstance(response_data['data'], dict):
@@ -265,10 +242,7 @@ class PaystackService:
             else:
                 data = response_data
 
-            print(f"[{_ts()}] Final data to return: {data}")
-
-            logger.info(f"[{_ts()}][PAYSTACK][OK] ref={reference} initialized")
-            print(f"[{_ts()}] PAYSTACK OK ref={reference}")
+            logger.info("[PAYSTACK][OK] ref=%s initialized", reference)
 
             result = {
                 'status': True,
@@ -279,17 +253,24 @@ class PaystackService:
                 }
             }
             
-            print(f"[{_ts()}] Returning result: {result}")
             return result
 
-        except Exception as e:
-            error_msg = f"Error in initialize_payment: {str(e)}"
-            logger.error(f"[{_ts()}][PAYSTACK][ERR] ref={reference} error={error_msg}")
-            print(f"[{_ts()}] CRITICAL ERROR in initialize_payment: {error_msg}")
-            print(f"[{_ts()}] Traceback: {traceback.format_exc()}")
+        except Exception:
+            logger.exception("[PAYSTACK][ERR] ref=%s initialize_payment failed", reference)
             raise
 
 
+_service: PaystackService | None = None
+
+
+def _get_service() -> PaystackService:
+    """Return the process-wide PaystackService; its settings never change at runtime"""
+    global _service
+    if _service is None:
+        _service = PaystackService()
+    return _service
+
+
 # Service functions to match your existing pattern
 def paystack_init_charge(
     *,
@@ -301,21 +282,12 @@ def paystack_init_charge(
     metadata: dict | None = None,
 ) -> dict:
     """Initialize Paystack payment charge"""
-    print(f"[{_ts()}] paystack_init_charge called")
-    print(f"[{_ts()}] Params: amount={amount}, currency={currency}, reference={reference}")
-    print(f"[{_ts()}] Params: customer={customer}, redirect_url={redirect_url}")
-    
     try:
-        platform_name = getattr(settings, "PLATFORM_NAME", "Duespay")
         platform_email = getattr(settings, "PLATFORM_EMAIL", "justondev05@gmail.com")
-        print(f"[{_ts()}] Platform: name={platform_name}, email={platform_email}")
 
-        email = (customer or {}).get("email") or platform_email
-        if "@" not in str(email):
+        email = (customer.get("email") if customer else None) or platform_email
+        if "@" not in email:
             email = platform_email
-        raw_name = (customer or {}).get("name") or platform_name
-        name = _sanitize_customer_name(raw_name)
-        print(f"[{_ts()}] Customer: name={name}, email={email}")
 
         # Prepare metadata
         meta = {"txn_ref": reference}
@@ -327,18 +299,13 @@ def paystack_init_charge(
                         for k, v in metadata.items()
                     }
                 )
-            except Exception as me:
-                print(f"[{_ts()}] Metadata update error: {str(me)}")
+            except Exception:
+                logger.debug("[PAYSTACK_CHARGE] metadata coercion failed ref=%s", reference)
                 if metadata:
                     meta.update(metadata)
 
-        print(f"[{_ts()}] Final metadata: {meta}")
+        service = _get_service()
 
-        print(f"[{_ts()}] Creating PaystackService instance...")
-        service = PaystackService()
-        print(f"[{_ts()}] PaystackService instance created successfully")
-
-        print(f"[{_ts()}] Calling service.initialize_payment...")
         result = service.initialize_payment(
             email=email,
             amount_naira=float(amount),
@@ -348,14 +315,12 @@ def paystack_init_charge(
             channels=['card', 'bank_transfer']
         )
         
-        print(f"[{_ts()}] service.initialize_payment returned: {result}")
         return result
         
-    except Exception as e:
-        error_msg = f"Error in paystack_init_charge: {str(e)}"
-        logger.error(f"[{_ts()}][PAYSTACK_CHARGE][ERR] ref={reference} error={error_msg}")
-        print(f"[{_ts()}] CRITICAL ERROR in paystack_init_charge: {error_msg}")
-        print(f"[{_ts()}] Traceback: {traceback.format_exc()}")
+    except Exception:
+        logger.exception(
+            "[PAYSTACK_CHARGE][ERR] ref=%s paystack_init_charge failed", reference
+        )
         raise
 
 
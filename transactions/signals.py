@@ -1,7 +1,13 @@
-from django.db.models.signals import post_save
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from .emails import send_admin_new_transaction_email, send_receipt_email
 from .models import Transaction, TransactionReceipt
+from .utils import bump_transaction_list_cache_version
+
+logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender=Transaction)
@@ -10,36 +16,51 @@ def notify_admin_on_transaction(sender, instance, created, **kwargs):
         association = instance.association
         admin = association.admin
         if admin.email:
-            send_admin_new_transaction_email(admin, association, instance)
+            # Send after commit so SMTP never runs inside an open DB transaction
+            transaction.on_commit(
+                lambda: send_admin_new_transaction_email(admin, association, instance)
+            )
 
 
 @receiver(post_save, sender=Transaction)
-def create_receipt_on_verification(sender, instance, created, **kwargs):
-    """Signal: Create and send receipt when transaction is verified"""
-    # Only proceed if transaction is verified
-    if instance.is_verified:
-        try:
-            # Get existing receipt or create new one
-            receipt, receipt_created = TransactionReceipt.objects.get_or_create(
-                transaction=instance
-            )
+@receiver(post_delete, sender=Transaction)
+def invalidate_transaction_list_cache(sender, instance, **kwargs):
+    # Bump after commit, otherwise a list read between the bump and the
+    # commit would cache the old rows under the new version
+    session_id = instance.session_id
+    transaction.on_commit(lambda: bump_transaction_list_cache_version(session_id))
 
-            # Always generate and send receipt (whether new or existing)
-            send_receipt_email(receipt)
 
-            if receipt_created:
-                print(
-                    f"✅ New receipt created and sent for transaction {instance.reference_id}"
-                )
-            else:
-                print(
-                    f"✅ Existing receipt resent for transaction {instance.reference_id}"
-                )
+def issue_transaction_receipt(txn):
+    """Create the receipt for a verified transaction (or reuse it) and email it"""
+    try:
+        # Get existing receipt or create new one
+        receipt, receipt_created = TransactionReceipt.objects.get_or_create(
+            transaction=txn
+        )
 
-        except Exception as e:
-            import logging
+        # Always generate and send receipt (whether new or existing)
+        send_receipt_email(receipt)
 
-            logger = logging.getLogger(__name__)
-            logger.error(
-                f"Failed to process receipt for transaction {instance.reference_id}: {str(e)}"
+        if receipt_created:
+            logger.info(
+                "New receipt created and sent for transaction %s",
+                txn.reference_id,
             )
+        else:
+            logger.info("Existing receipt resent for transaction %s", txn.reference_id)
+
+    except Exception as e:
+        logger.error(
+            "Failed to process receipt for transaction %s: %s",
+            txn.reference_id,
+            e,
+        )
+
+
+@receiver(post_save, sender=Transaction)
+def create_receipt_on_verification(sender, instance, created, **kwargs):
+    """Signal: Create and send receipt when transaction is verified"""
+    # Only proceed if transaction is verified
+    if instance.is_verified:
+        issue_transaction_receipt(instance)
@@ -1,9 +1,33 @@
 import random
 import string
 
+from django.conf import settings
+from django.core.cache import cache
+
+# Per-process caches can't see another worker's version bump, so the list
+# response cache is only used when the default cache is shared
+TRANSACTION_LIST_CACHE_ENABLED = settings.CACHES["default"]["BACKEND"] not in (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
 
 def generate_unique_reference_id():
     digits4 = "".join(random.choices(string.digits, k=4))
     digits3 = "".join(random.choices(string.digits, k=3))
     letters2 = "".join(random.choices(string.ascii_uppercase, k=2))
     return f"TX-{digits4}-{digits3}-{letters2}"
+
+
+def bump_transaction_list_cache_version(session_id):
+    """Orphan every cached transaction list page for the session."""
+    if not TRANSACTION_LIST_CACHE_ENABLED:
+        return
+
+    from .models import Transaction
+
+    version_key = Transaction.LIST_CACHE_VERSION_KEY.format(session_id=session_id)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, 1, None)
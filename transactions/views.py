@@ -1,12 +1,13 @@
-import json
+import hashlib
 import logging
 from decimal import Decimal
 from datetime import datetime, timedelta
 
+import orjson
 from django.conf import settings
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
 from django.http import HttpResponse, HttpResponseForbidden
-from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
@@ -16,15 +17,13 @@ from rest_framework.generics import RetrieveAPIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination
 
-from association.models import Association, Session
+from association.models import Session
 from payers.models import Payer
 from payments.models import PaymentItem, ReceiverBankAccount
 from transactions.models import Transaction
 
-print("DEBUG: Starting to import paystackServices")
-
 from .paystackServices import (
     is_valid_paystack_signature,
     paystack_init_charge,
@@ -32,11 +31,40 @@ from .paystackServices import (
 )
 from .models import Transaction, TransactionReceipt
 from .serializers import TransactionReceiptDetailSerializer, TransactionSerializer
+from .signals import issue_transaction_receipt
+from .utils import (
+    TRANSACTION_LIST_CACHE_ENABLED,
+    bump_transaction_list_cache_version,
+)
 
 logger = logging.getLogger(__name__)
 
-class TransactionPagination(PageNumberPagination):
-    page_size = 7  
+# Paystack retries webhooks; remember verified references so replays skip the DB
+WEBHOOK_VERIFIED_CACHE_KEY = "paystack_webhook_verified:{reference}"
+WEBHOOK_VERIFIED_CACHE_TIMEOUT = 60 * 5  # 5 minutes
+
+# Settings are fixed after startup; resolve the Paystack redirect target
+# (frontend /pay page) and fallback customer email once
+_REDIRECT_URL = (
+    f"{str(getattr(settings, 'FRONTEND_URL', 'https://nacos-duespay.vercel.app/')).rstrip('/')}/pay"
+)
+_DEFAULT_EMAIL = getattr(settings, "PLATFORM_EMAIL", "justondev05@gmail.com")
+
+# List meta for a session with no transactions (same values list() computes)
+EMPTY_META = {
+    "total_collections": 0.0,
+    "completed_payments": 0,
+    "pending_payments": 0,
+    "total_transactions": 0,
+    "percent_collections": "-",
+    "percent_completed": "0%",
+    "percent_pending": "0%",
+}
+
+class TransactionPagination(CursorPagination):
+    # Keyset pagination over the (session, submitted_at, id) index; no COUNT or OFFSET
+    ordering = ("-submitted_at", "-id")
+    page_size = 7
     page_size_query_param = 'page_size'  
     max_page_size = 1000
 
@@ -80,9 +108,10 @@ class TransactionViewSet(viewsets.ModelViewSet):
             elif status_param.lower() == "unverified":
                 queryset = queryset.filter(is_verified=False)
 
-        # Search by payer name or reference id (case-insensitive)
-        search = self.request.query_params.get("search")
-        if search:
+        # Search by payer name or reference id (case-insensitive); single
+        # characters match almost every row, so require at least two
+        search = (self.request.query_params.get("search") or "").strip()
+        if len(search) >= 2:
             queryset = queryset.filter(
                 models.Q(reference_id__icontains=search)
                 | models.Q(payer__first_name__icontains=search)
@@ -90,7 +119,8 @@ class TransactionViewSet(viewsets.ModelViewSet):
                 | models.Q(payer__matric_number__icontains=search)
             )
 
-        return queryset
+        # TransactionSerializer reads payer fields and payment item titles per row
+        return queryset.select_related("payer").prefetch_related("payment_items")
 
     def perform_create(self, serializer):
         association = getattr(self.request.user, "association", None)
@@ -152,7 +182,55 @@ class TransactionViewSet(viewsets.ModelViewSet):
                 }
             )
 
-        queryset = self.filter_queryset(self.get_queryset()).order_by("-submitted_at")
+        current_session_data = {
+            "id": current_session.id,
+            "title": current_session.title,
+            "start_date": current_session.start_date,
+            "end_date": current_session.end_date,
+            "is_active": current_session.is_active,
+        }
+
+        # Serve repeated dashboard reads from a short-lived cache keyed on
+        # every parameter that shapes the response (shared cache backends only)
+        cache_key = None
+        if TRANSACTION_LIST_CACHE_ENABLED:
+            params = request.query_params
+            params_digest = hashlib.md5(
+                "|".join(
+                    params.get(name, "")
+                    for name in ("status", "search", "cursor", "page_size")
+                ).encode()
+            ).hexdigest()
+            cache_key = Transaction.LIST_CACHE_KEY.format(
+                association_id=association.id,
+                session_id=current_session.id,
+                version=cache.get(
+                    Transaction.LIST_CACHE_VERSION_KEY.format(
+                        session_id=current_session.id
+                    ),
+                    0,
+                ),
+                params=params_digest,
+            )
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return Response(cached)
+
+        # A fresh session has no rows; one EXISTS probe skips the page and
+        # aggregate queries entirely
+        if not Transaction.objects.filter(session=current_session).exists():
+            return Response(
+                {
+                    "next": None,
+                    "previous": None,
+                    "results": [],
+                    "meta": {**EMPTY_META, "current_session": current_session_data},
+                }
+            )
+
+        queryset = self.filter_queryset(self.get_queryset()).order_by(
+            "-submitted_at", "-id"
+        )
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
@@ -161,18 +239,23 @@ class TransactionViewSet(viewsets.ModelViewSet):
             serializer = self.get_serializer(queryset, many=True)
             data = serializer.data
 
-        total_collections = (
-            queryset.aggregate(total=models.Sum("amount_paid"))["total"] or 0
+        # Collect all meta numbers in a single conditional aggregate query
+        # (is_verified=True means completed, is_verified=False means pending).
+        # This can't ride on the page query as window aggregates: the cursor
+        # adds a WHERE on submitted_at/id, so OVER () would only see rows
+        # from the cursor onwards rather than the whole session
+        stats = queryset.aggregate(
+            total=models.Sum("amount_paid"),
+            completed=models.Count("pk", filter=models.Q(is_verified=True)),
+            pending=models.Count("pk", filter=models.Q(is_verified=False)),
+            total_count=models.Count("pk"),
         )
-
-        # Completed Payments (assuming is_verified=True means completed)
-        completed_count = queryset.filter(is_verified=True).count()
-
-        # Pending Payments (assuming is_verified=False means pending)
-        pending_count = queryset.filter(is_verified=False).count()
+        total_collections = stats["total"] or 0
+        completed_count = stats["completed"]
+        pending_count = stats["pending"]
 
         # Calculate percentages
-        total_count = queryset.count()
+        total_count = stats["total_count"]
         percent_completed = (
             round((completed_count / total_count * 100), 1) if total_count > 0 else 0
         )
@@ -188,34 +271,25 @@ class TransactionViewSet(viewsets.ModelViewSet):
             "percent_collections": "-",  # You can calculate this based on your business logic
             "percent_completed": f"{percent_completed}%",
             "percent_pending": f"{percent_pending}%",
-            "current_session": (
-                {
-                    "id": current_session.id,
-                    "title": current_session.title,
-                    "start_date": current_session.start_date,
-                    "end_date": current_session.end_date,
-                    "is_active": current_session.is_active,
-                }
-                if current_session
-                else None
-            ),
+            "current_session": current_session_data,
         }
 
         if page is not None:
             paginated_response = self.get_paginated_response(data)
             response_data = paginated_response.data
             response_data["meta"] = meta
-            return Response(response_data)
         else:
-            return Response(
-                {
-                    "results": data,
-                    "count": len(data),
-                    "next": None,
-                    "previous": None,
-                    "meta": meta,
-                }
-            )
+            response_data = {
+                "results": data,
+                "count": len(data),
+                "next": None,
+                "previous": None,
+                "meta": meta,
+            }
+
+        if cache_key is not None:
+            cache.set(cache_key, response_data, Transaction.LIST_CACHE_TIMEOUT)
+        return Response(response_data)
 
 
 class TransactionReceiptDetailView(RetrieveAPIView):
@@ -240,12 +314,25 @@ class InitiatePaymentView(APIView):
             )
 
         try:
-            payer = Payer.objects.get(pk=data["payer_id"])
-            association = Association.objects.get(pk=data["association_id"])
-            session = Session.objects.get(
-                pk=data["session_id"], association=association
+            # The session lookup also validates and loads its association.
+            # Only the columns this view and the new-transaction signals
+            # (admin email, notification) read are fetched
+            session = (
+                Session.objects.select_related("association")
+                .only(
+                    "id",
+                    "association",
+                    "association__id",
+                    "association__admin",
+                    "association__association_name",
+                )
+                .get(pk=data["session_id"], association_id=data["association_id"])
             )
-        except (Payer.DoesNotExist, Association.DoesNotExist, Session.DoesNotExist):
+            association = session.association
+            payer = Payer.objects.only(
+                "id", "first_name", "last_name", "email"
+            ).get(pk=data["payer_id"])
+        except (Payer.DoesNotExist, Session.DoesNotExist):
             return Response(
                 {"error": "Invalid payer_id, association_id, or session_id"}, status=400
             )
@@ -255,45 +342,56 @@ class InitiatePaymentView(APIView):
             return Response(
                 {"error": "payment_item_ids must be a non-empty list"}, status=400
             )
-        items_qs = PaymentItem.objects.filter(id__in=item_ids, session=session)
-        if items_qs.count() != len(set(item_ids)):
+        # One aggregate both checks every id exists and sums the base amount
+        unique_item_ids = set(item_ids)
+        items = PaymentItem.objects.filter(
+            id__in=unique_item_ids, session=session
+        ).aggregate(total=models.Sum("amount"), found=models.Count("id"))
+        if items["found"] != len(unique_item_ids):
             return Response(
                 {"error": "One or more payment items not found for the session"},
                 status=400,
             )
 
-        # Calculate total amount from payment items (base amount without fees)
-        base_amount = sum((item.amount for item in items_qs), Decimal("0.00"))
+        # Total amount from payment items (base amount without fees)
+        base_amount = items["total"] or Decimal("0.00")
 
         # Calculate Paystack charges
         charge_breakdown = calculate_paystack_charges(base_amount)
         total_with_fees = charge_breakdown["total_amount"]
         transaction_fee = charge_breakdown["transaction_fee"]
 
-        # Create pending transaction with BASE amount (what association receives)
-        txn = Transaction.objects.create(
-            payer=payer,
-            association=association,
-            amount_paid=base_amount,  # Store base amount, not total with fees
-            is_verified=False,
-            session=session,
-        )
-        txn.payment_items.set(items_qs)
+        # Commit the transaction and its item links together; the Paystack
+        # call below stays outside so no DB transaction spans the network
+        with transaction.atomic():
+            # Create pending transaction with BASE amount (what association receives)
+            txn = Transaction.objects.create(
+                payer=payer,
+                association=association,
+                amount_paid=base_amount,  # Store base amount, not total with fees
+                is_verified=False,
+                session=session,
+            )
+            # The transaction is brand new, so its item links can go in as one
+            # INSERT; payment_items.set() would first diff against existing rows
+            PaymentItemLink = Transaction.payment_items.through
+            PaymentItemLink.objects.bulk_create(
+                [
+                    PaymentItemLink(transaction_id=txn.id, paymentitem_id=item_id)
+                    for item_id in unique_item_ids
+                ]
+            )
 
         # Customer details - always use payer information
         full_name = f"{getattr(payer, 'first_name', '')} {getattr(payer, 'last_name', '')}".strip() or "DuesPay User"
-        email = getattr(payer, "email", None) or getattr(settings, "PLATFORM_EMAIL", "justondev05@gmail.com")
+        email = getattr(payer, "email", None) or _DEFAULT_EMAIL
         
         # Ensure valid email format
         if "@" not in str(email):
-            email = getattr(settings, "PLATFORM_EMAIL", "justondev05@gmail.com")
+            email = _DEFAULT_EMAIL
         
         customer = {"name": full_name, "email": email}
 
-        # Frontend redirect - Paystack will redirect to /pay after payment
-        frontend = getattr(settings, "FRONTEND_URL", "https://nacos-duespay.vercel.app/")
-        redirect_url = f"{str(frontend).rstrip('/')}/pay"
-
         # Metadata for reconciliation
         metadata = {
             "txn_ref": txn.reference_id,
@@ -305,10 +403,11 @@ class InitiatePaymentView(APIView):
         }
 
         logger.info(
-            f"[INITIATE] ref={txn.reference_id} base={base_amount} fee={transaction_fee} total={total_with_fees}"
-        )
-        print(
-            f"[{timezone.now().isoformat()}] INITIATE ref={txn.reference_id} base={base_amount} fee={transaction_fee} total={total_with_fees}"
+            "[INITIATE] ref=%s base=%s fee=%s total=%s",
+            txn.reference_id,
+            base_amount,
+            transaction_fee,
+            total_with_fees,
         )
 
         try:
@@ -318,12 +417,12 @@ class InitiatePaymentView(APIView):
                 currency="NGN",
                 reference=txn.reference_id,
                 customer=customer,
-                redirect_url=redirect_url,
+                redirect_url=_REDIRECT_URL,
                 metadata=metadata,
             )
         except Exception:
             logger.exception(
-                f"[INITIATE][ERROR] ref={txn.reference_id} Paystack init failed"
+                "[INITIATE][ERROR] ref=%s Paystack init failed", txn.reference_id
             )
             return Response({"error": "Failed to initialize payment"}, status=502)
 
@@ -331,7 +430,9 @@ class InitiatePaymentView(APIView):
         checkout_url = data_obj.get("authorization_url")
         if not checkout_url:
             logger.error(
-                f"[INITIATE][ERROR] ref={txn.reference_id} Missing authorization_url resp={paystack_res}"
+                "[INITIATE][ERROR] ref=%s Missing authorization_url resp=%s",
+                txn.reference_id,
+                paystack_res,
             )
             return Response(
                 {
@@ -342,7 +443,7 @@ class InitiatePaymentView(APIView):
             )
 
         logger.info(
-            f"[INITIATE][OK] ref={txn.reference_id} authorization_url={checkout_url}"
+            "[INITIATE][OK] ref=%s authorization_url=%s", txn.reference_id, checkout_url
         )
         
         # Return breakdown for frontend display
@@ -370,15 +471,14 @@ def paystack_webhook(request):
         return HttpResponseForbidden()
 
     try:
-        payload = json.loads(request.body.decode("utf-8"))
-    except json.JSONDecodeError:
+        payload = orjson.loads(request.body)
+    except orjson.JSONDecodeError:
         logger.error("[PAYSTACK_WEBHOOK] invalid JSON")
         return HttpResponse(status=200)
 
     event = payload.get("event")
     data = payload.get("data") or {}
-    logger.info(f"[PAYSTACK_WEBHOOK] event={event} data_keys={list(data.keys())}")
-    print(f"[{timezone.now().isoformat()}] PAYSTACK_WEBHOOK event={event}")
+    logger.info("[PAYSTACK_WEBHOOK] event=%s data_keys=%s", event, list(data))
 
     # Handle successful charge events
     if event not in ("charge.success", "transfer.success"):
@@ -390,28 +490,48 @@ def paystack_webhook(request):
         logger.warning("[PAYSTACK_WEBHOOK] No reference in webhook data")
         return HttpResponse(status=200)
 
-    try:
-        txn = Transaction.objects.get(reference_id=reference)
-    except Transaction.DoesNotExist:
-        logger.warning(f"[PAYSTACK_WEBHOOK] No transaction found for ref={reference}")
+    verified_key = WEBHOOK_VERIFIED_CACHE_KEY.format(reference=reference)
+    if cache.get(verified_key):
+        logger.info("[PAYSTACK_WEBHOOK] Already verified ref=%s (cached)", reference)
         return HttpResponse(status=200)
 
-    if txn.is_verified:
-        logger.info(f"[PAYSTACK_WEBHOOK] Already verified ref={txn.reference_id}")
+    # Flip the flag with a single conditional UPDATE; the is_verified=False
+    # filter also makes concurrent retries of the same event race-safe
+    updated = Transaction.objects.filter(
+        reference_id=reference, is_verified=False
+    ).update(is_verified=True)
+    if not updated:
+        logger.info(
+            "[PAYSTACK_WEBHOOK] No pending transaction for ref=%s "
+            "(already verified or unknown)",
+            reference,
+        )
         return HttpResponse(status=200)
+    # Only references this webhook actually verified are remembered, so the
+    # cached "already verified" log line above stays accurate
+    cache.set(verified_key, True, WEBHOOK_VERIFIED_CACHE_TIMEOUT)
+
+    # update() fires no signals, so issue the receipt and refresh the admin
+    # list here; the receipt email reads payer, session and association admin
+    txn = Transaction.objects.select_related(
+        "payer", "session", "association__admin"
+    ).get(reference_id=reference)
+    issue_transaction_receipt(txn)
+    bump_transaction_list_cache_version(txn.session_id)
 
     # Get amount from webhook (in kobo, convert to naira) for logging
     amount_kobo = data.get("amount", 0)
     amount_paid_total = Decimal(str(amount_kobo)) / 100
 
-    # Only update verification status, keep the base amount already stored
+    # Only the verification status changes, the base amount stays as stored
     # The transaction was created with base_amount (what association receives)
     # The webhook amount includes Paystack fees, which we don't want to store
-    txn.is_verified = True
-    txn.save(update_fields=["is_verified"])
-    
-    logger.info(f"[PAYSTACK_WEBHOOK][VERIFIED] ref={txn.reference_id} base_amount={txn.amount_paid} total_paid={amount_paid_total}")
-    print(f"[{timezone.now().isoformat()}] PAYSTACK VERIFIED ref={txn.reference_id} base_amount={txn.amount_paid} total_paid={amount_paid_total}")
+    logger.info(
+        "[PAYSTACK_WEBHOOK][VERIFIED] ref=%s base_amount=%s total_paid=%s",
+        txn.reference_id,
+        txn.amount_paid,
+        amount_paid_total,
+    )
 
     return HttpResponse(status=200)
 
@@ -424,19 +544,20 @@ class PaymentStatusView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, reference_id: str):
-        try:
-            txn = Transaction.objects.select_related(
-                "payer", "association", "session"
-            ).get(reference_id=reference_id)
-        except Transaction.DoesNotExist:
+        # Only these columns are needed; the receipt comes in via a LEFT JOIN
+        row = (
+            Transaction.objects.filter(reference_id=reference_id)
+            .values("reference_id", "is_verified", "amount_paid", "receipt__receipt_id")
+            .first()
+        )
+        if row is None:
             return Response({"exists": False}, status=200)
 
-        receipt = getattr(txn, "receipt", None)
         payload = {
             "exists": True,
-            "reference_id": txn.reference_id,
-            "is_verified": txn.is_verified,
-            "amount_paid": str(txn.amount_paid),
-            "receipt_id": getattr(receipt, "receipt_id", None),
+            "reference_id": row["reference_id"],
+            "is_verified": row["is_verified"],
+            "amount_paid": str(row["amount_paid"]),
+            "receipt_id": row["receipt__receipt_id"],
         }
         return Response(payload, status=200)